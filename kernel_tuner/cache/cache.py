@@ -5,26 +5,34 @@ In order to modify and read cache files, the Cache class should be used, see its
 
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import sys
+import threading
 from collections.abc import Mapping
 from datetime import datetime
 from functools import cached_property
 from functools import lru_cache as cache
 from os import PathLike
 from pathlib import Path
-from typing import cast, Any, Union, Optional, Dict, Iterable, Iterator
+from types import MappingProxyType
+from typing import TYPE_CHECKING, cast, Any, Union, Optional, Dict, Iterable, Iterator
 
 import jsonschema
-from semver import Version
+import numpy as np
 
 import kernel_tuner.util as util
 from .convert import convert_cache
 from .json import CacheFileJSON, CacheLineJSON
 from .json_encoder import CacheLineEncoder
-from .file import read_cache, write_cache, append_cache_line
-from .versions import LATEST_VERSION, VERSIONS
+from .file import CachedLinePosition, read_cache, write_cache, append_cache_lines
+from .versions import LATEST_VERSION, VERSIONS, parse_version
 from .paths import get_schema_path
 
+if TYPE_CHECKING:
+    from semver import Version
+
 
 class Cache:
     """Writes and reads cache files.
@@ -71,6 +79,9 @@ class Cache:
         "GFLOP/s",
     }
 
+    # Maximum number of seconds an appended cache line is kept in memory before it is written to the cache file
+    FLUSH_INTERVAL: float = 5.0
+
     @classmethod
     def create(
         cls,
@@ -111,7 +122,7 @@ class Cache:
             raise ValueError("Found a reserved key in tune_params_keys")
 
         cache_json: CacheFileJSON = {
-            "schema_version": str(LATEST_VERSION),
+            "schema_version": LATEST_VERSION,
             "device_name": device_name,
             "kernel_name": kernel_name,
             "problem_size": problem_size,
@@ -131,7 +142,9 @@ class Cache:
         This cache file should have the latest version
         """
         cache_json = read_cache(filename)
-        assert Version.parse(cache_json["schema_version"]) == LATEST_VERSION, "Cache file is not of the latest version."
+        assert parse_version(cache_json["schema_version"]) == parse_version(LATEST_VERSION), (
+            "Cache file is not of the latest version."
+        )
         cls.validate_json(cache_json)
         return cls(filename, cache_json, readonly=False)
 
@@ -164,43 +177,62 @@ class Cache:
             raise jsonschema.ValidationError("Key 'schema_version' is not present in cache data")
         schema_version = cache_json["schema_version"]
         cls.__validate_json_schema_version(schema_version)
-        schema = cls.__get_schema_for_version(schema_version)
-        format_checker = _get_format_checker()
-        jsonschema.validate(instance=cache_json, schema=schema, format_checker=format_checker)
+        validator = _get_validator(schema_version)
+        # Raise the same error as jsonschema.validate() would
+        error = jsonschema.exceptions.best_match(validator.iter_errors(cache_json))
+        if error is not None:
+            raise error
 
     @classmethod
     def __validate_json_schema_version(cls, version: str):
         try:
-            if Version.parse(version) in VERSIONS:
+            if parse_version(version) in (parse_version(v) for v in VERSIONS):
                 return
         except (ValueError, TypeError):
             pass
         raise jsonschema.ValidationError(f"Invalid version {repr(version)} found.")
 
-    @classmethod
-    def __get_schema_for_version(cls, version: str):
-        schema_path = get_schema_path(version)
-        with open(schema_path, "r") as file:
-            return json.load(file)
-
     def __init__(self, filename: PathLike, cache_json: CacheFileJSON, *, readonly: bool):
         """Inits a cache file instance, given that the file referred to by ``filename`` contains data ``cache_json``.
 
         Argument ``cache_json`` is a cache dictionary expected to have the latest cache version.
         """
         self._filename = Path(filename)
-        self._cache_json = cache_json
+        # A readonly cache is not copied, instead its content is only accessible through a readonly view
+        self._cache_json = cast(CacheFileJSON, MappingProxyType(cache_json)) if readonly else cache_json
         self._readonly = readonly
+        # The keys of the tunable parameters are used for every line lookup, hence they are interned once
+        self._tune_params_keys = tuple(map(sys.intern, cache_json["tune_params_keys"]))
+        # Sets of the values of each tunable parameter, for validating the parameters of appended lines
+        self._tune_params_sets = {key: _as_set(values) for key, values in cache_json["tune_params"].items()}
+        self._revision = 0
+        self._file_stamp = _get_file_stamp(self._filename)
 
     @cached_property
     def filepath(self) -> Path:
         """Returns the path to the cache file."""
         return self._filename
 
+    @property
+    def revision(self) -> int:
+        """Number of times this instance has written appended lines to the cache file."""
+        return self._revision
+
+    def is_stale(self) -> bool:
+        """Returns whether the cache file has been modified (or removed) other than through this instance.
+
+        Only the modification time and size of the file are checked, the file itself is not read.
+        """
+        return _get_file_stamp(self._filename) != self._file_stamp
+
+    def _mark_written(self) -> None:
+        self._revision += 1
+        self._file_stamp = _get_file_stamp(self._filename)
+
     @cached_property
     def version(self) -> Version:
         """Version of the cache file."""
-        return Version.parse(self._cache_json["schema_version"])
+        return _parse_version(self._cache_json["schema_version"])
 
     @cached_property
     def lines(self) -> Union[Lines, ReadableLines]:
@@ -215,6 +247,9 @@ class Cache:
 
         Behaves exactly like an only readable dict, except with an `append` method for appending lines.
 
+        Appended lines are immediately visible through this instance, but are written to the cache file in batches:
+        at most ``Cache.FLUSH_INTERVAL`` seconds after appending, when calling `flush`, or when the interpreter exits.
+
         Usage Example:
             cache: Cache = ...
 
@@ -222,6 +257,7 @@ class Cache:
             print(f"There are {len(cache.lines)} lines")
 
             cache.lines.append(..., tune_param_a=1, tune_param_b=2, tune_param_c=3)
+            cache.lines.flush()  # optional, pending lines are also written periodically and at exit
 
             print(f"There are {len(cache.lines)} lines")
             for line_id, line in cache.lines.items():
@@ -241,6 +277,11 @@ class Cache:
             self._cache = cache
             self._filename = filename
             self._lines = cache_json["cache"]
+            self._pending: dict[str, CacheLineJSON] = {}
+            self._lock = threading.RLock()
+            self._flush_timer: Optional[threading.Timer] = None
+            self._position = CachedLinePosition()
+            self._index: Optional[tuple[dict[str, np.ndarray], np.ndarray]] = None
 
         def __getitem__(self, line_id: str) -> Cache.Line:
             """Returns a cache line given the parameters (in order)."""
@@ -314,8 +355,46 @@ class Cache:
                 GFLOP_per_s,
                 tune_params,
             )
-            self._lines[line_id] = line
-            append_cache_line(line_id, line, self._filename)
+            with self._lock:
+                self._lines[line_id] = line
+                self._pending[line_id] = line
+                self._index = None
+                self._schedule_flush()
+
+        def flush(self) -> None:
+            """Writes all pending cache lines to the cache file, and flushes them to disk."""
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                    atexit.unregister(self.flush)
+                if not self._pending:
+                    return
+                if self._cache.is_stale():
+                    # The file has been rewritten other than through this instance, so the end of the cache has to be
+                    # searched again instead of appending at the previous position
+                    self._position = CachedLinePosition()
+                # The pending lines are only discarded once written. If writing fails, the end of the cache is searched
+                # again and another flush is scheduled, such that the lines are also retried if flush is not called
+                # again, e.g. when the timer flushed them.
+                try:
+                    self._position = append_cache_lines(self._pending, self._filename, self._position, durable=True)
+                except BaseException:
+                    self._position = CachedLinePosition()
+                    self._schedule_flush()
+                    raise
+                self._pending = {}
+                self._cache._mark_written()
+
+        def _schedule_flush(self) -> None:
+            # The timer is not restarted on consecutive appends, such that a steady stream of appends still gets
+            # written to the file every FLUSH_INTERVAL seconds.
+            if self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(Cache.FLUSH_INTERVAL, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+            atexit.register(self.flush)
 
         def get(self, line_id: Optional[str] = None, default=None, **params) -> Union[Cache.Line, list[Cache.Line]]:
             """Returns a cache line corresponding with ``line_id``.
@@ -328,15 +407,15 @@ class Cache:
             does not exist. Otherwise a list containing all lines that match the given parameters are returned, and in
             this case, default is disregarded.
 
-            It should be noted that partially matching the lines in the above manner is slow, as this implementation
-            generates the fill line ids for all of its matches. A future implementation might want to improve upon this
-            process with a custom datastructure.
+            Partially matching the lines in the above manner uses a columnar index of the tunable parameter values of
+            all lines, which is built on the first partial match after lines have been appended.
 
             If ``line_id`` is none and no parameters are defined, a list of all the lines is returned.
             """
             if line_id is None and len(params) == 0:
                 return list(Cache.Line(self._cache, line) for line in self._lines.values())
-            if not all(key in self._cache.tune_params_keys for key in params):
+            tune_params_keys = self._cache._tune_params_keys
+            if not all(key in tune_params_keys for key in params):
                 raise ValueError("The keys in the parameters should be in `tune_params_keys`")
 
             line_ids: Iterable[str]
@@ -344,8 +423,12 @@ class Cache:
                 line_ids = (line_id,)
                 multiple = False
             else:
-                line_ids = self.__get_matching_line_ids(params)
-                multiple = not all(key in params for key in self._cache.tune_params_keys)
+                multiple = len(params) < len(tune_params_keys)
+                if multiple:
+                    line_ids = self.__get_partially_matching_line_ids(params)
+                else:
+                    # All parameters are given, so the line id can be constructed directly
+                    line_ids = (self.__get_line_id([params[key] for key in tune_params_keys]),)
 
             if multiple:
                 lines_json_iter = (self._lines[k] for k in line_ids)
@@ -361,28 +444,49 @@ class Cache:
         def __get_line_id(self, param_list: list[Any]) -> str:
             return json.dumps(param_list, separators=(",", ":"))[1:-1]
 
-        def __get_matching_line_ids(self, params: dict[str, Any]):
-            param_lists: list[list[Any]] = [[]]
-            for key in self._cache.tune_params_keys:
-                # If a tunable key is found, only match the value of the parameter
-                if key in params:
-                    value = params[key]
-                    for par_list in param_lists:
-                        par_list.append(value)
-                # If the tunable key is not present, generate all possible matchin keys
-                else:
-                    prev_lists = param_lists
-                    param_lists = []
-                    for value in self._cache.tune_params[key]:
-                        param_lists.extend(it + [value] for it in prev_lists)
-            return [line_id for line_id in map(self.__get_line_id, param_lists) if line_id in self._lines]
+        def __get_partially_matching_line_ids(self, params: dict[str, Any]) -> list[str]:
+            columns, line_ids = self.__get_index()
+            mask = np.ones(len(line_ids), dtype=bool)
+            for key, value in params.items():
+                # Values are compared in the same (JSON) representation as they have within line ids
+                mask &= columns[key] == self.__get_line_id([value])
+            return line_ids[mask].tolist()
+
+        def __get_index(self) -> tuple[dict[str, np.ndarray], np.ndarray]:
+            with self._lock:
+                if self._index is None:
+                    lines = self._lines.values()
+                    columns = {
+                        key: np.array(self.__get_value_ids(line[key] for line in lines), dtype=str)
+                        for key in self._cache._tune_params_keys
+                    }
+                    self._index = (columns, np.array(list(self._lines.keys()), dtype=object))
+                return self._index
+
+        def __get_value_ids(self, values: Iterable[Any]) -> list[str]:
+            # Parameters only take a few distinct values, so each value is only converted once
+            value_ids: dict[tuple[type, Any], str] = {}
+            result = []
+            for value in values:
+                try:
+                    value_id = value_ids[(type(value), value)]
+                except KeyError:
+                    value_id = value_ids[(type(value), value)] = self.__get_line_id([value])
+                except TypeError:  # unhashable values, like lists
+                    value_id = self.__get_line_id([value])
+                result.append(value_id)
+            return result
 
         def __get_line_id_from_tune_params_dict(self, tune_params: dict) -> str:
             param_list = []
-            for key in self._cache.tune_params_keys:
+            for key in self._cache._tune_params_keys:
                 if key in tune_params:
                     value = tune_params[key]
-                    if value not in self._cache.tune_params[key]:
+                    try:
+                        is_valid = value in self._cache._tune_params_sets[key]
+                    except TypeError:  # unhashable values, like lists
+                        is_valid = value in self._cache.tune_params[key]
+                    if not is_valid:
                         raise ValueError(f"Invalid value {value} for tunable parameter {key}")
                     param_list.append(value)
                 else:
@@ -420,7 +524,15 @@ class Cache:
             return line
 
     class ReadableLines(Lines):
-        """Cache lines in a readonly cache file."""
+        """Cache lines in a readonly cache file.
+
+        The cache lines are accessed through a readonly view of the cache file's content, instead of a copy of it.
+        """
+
+        def __init__(self, cache: Cache, filename: PathLike, cache_json: CacheFileJSON):
+            """Inits a new ReadableLines instance."""
+            super().__init__(cache, filename, cache_json)
+            self._lines = MappingProxyType(self._lines)
 
         def append(*args, **kwargs):
             """Dummy method that does nothing."""
@@ -458,6 +570,9 @@ class Cache:
             collections.abc.Mapping: https://docs.python.org/3/library/collections.abc.html
         """
 
+        # Lines are created for every access to a cache line, so they should be as lightweight as possible
+        __slots__ = ("_cache", "_line", "_time", "_timestamp")
+
         compile_time: float
         verification_time: int
         benchmark_time: float
@@ -466,11 +581,13 @@ class Cache:
 
         @property
         def time(self) -> Union[float, util.ErrorConfig]:
-            """The time of a cache line."""
-            time_or_error = self["time"]
-            if isinstance(time_or_error, str):
-                return util.ErrorConfig.from_str(time_or_error)
-            return time_or_error
+            """The time of a cache line, converted on first access."""
+            if self._time is _UNSET:
+                time_or_error = self["time"]
+                if isinstance(time_or_error, str):
+                    time_or_error = util.ErrorConfig.from_str(time_or_error)
+                self._time = time_or_error
+            return self._time
 
         @property
         def times(self) -> Optional[list[float]]:
@@ -479,8 +596,10 @@ class Cache:
 
         @property
         def timestamp(self) -> datetime:
-            """The timestamp as a datetime object."""
-            return datetime.fromisoformat(self["timestamp"])
+            """The timestamp as a datetime object, parsed on first access."""
+            if self._timestamp is _UNSET:
+                self._timestamp = datetime.fromisoformat(self["timestamp"])
+            return self._timestamp
 
         @property
         def GFLOP_per_s(self) -> Optional[float]:
@@ -491,6 +610,8 @@ class Cache:
             """Inits a new CacheLines instance."""
             self._cache = cache
             self._line: Dict = line_json  # type: ignore
+            self._time: Any = _UNSET
+            self._timestamp: Any = _UNSET
 
         def __getitem__(self, key: str):
             """Returns an item in a line."""
@@ -553,11 +674,51 @@ class Cache:
         return self._cache_json["objective"]
 
 
+def _get_file_stamp(filename: PathLike) -> Optional[tuple[int, int]]:
+    # The size is included because the modification time may not change for writes in quick succession
+    try:
+        stat = os.stat(filename)
+        return stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return None
+
+
+def _as_set(values: list) -> Union[frozenset, list]:
+    """Returns the values as a set, or the values themselves if any of them is not hashable."""
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+# Marks lazily converted attributes of cache lines that have not been converted yet
+_UNSET = object()
+
+
 @cache
 def _get_cache_line_json_encoder():
     return CacheLineEncoder()
 
 
+@cache
+def _parse_version(version: str) -> Version:
+    # semver is imported here, as it is only needed for the version attribute of a cache
+    from semver import Version
+
+    return Version.parse(version)
+
+
+@cache
+def _get_validator(version: str):
+    """Returns a validator for cache files of a specific version, which is created only once per version."""
+    schema_path = get_schema_path(version)
+    with open(schema_path, "r") as file:
+        schema = json.load(file)
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema, format_checker=_get_format_checker())
+
+
 @cache
 def _get_format_checker():
     """Returns a JSON format checker instance."""
@@ -1,12 +1,45 @@
 """This module contains several functions used to perform several operations on cachefiles."""
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from os import PathLike
 from shutil import copyfile
-from typing import List, Any
+from types import SimpleNamespace
+from typing import List, Any, Iterator, Tuple
 
-from .cache import Cache
+import jsonschema
+
+from .cache import Cache, _get_validator
 from .convert import convert_cache_file, convert_cache_to_t4
-from .file import read_cache, write_cache
+from .file import (
+    CachedLinePosition,
+    append_cache_lines,
+    get_temporary_filename,
+    read_cache,
+    read_cache_header,
+    read_cache_line,
+    replace_cache_file,
+    write_cache,
+)
+from .versions import LATEST_VERSION
+
+# ijson is an optional dependency (the "fast" extra), used to stream large cache files instead of loading them at once
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Cache files of at least this size (in bytes) are streamed when ijson is installed, and single cache lines are read
+# from them without parsing the rest of the file
+STREAMING_THRESHOLD = 4 * 1024 * 1024
+
+# Number of cache lines that are buffered before they are written to the output file while streaming
+STREAMING_BATCH_SIZE = 1000
+
+# Maximum number of cache files that are processed concurrently, each of which is parsed as a whole in memory. Parsing
+# and validating hold the GIL, so more files mainly increase the memory usage; two files were also held in memory at
+# once when the files were processed one after another.
+MAX_CONCURRENT_FILES = 2
 
 
 def assert_cache_files_have_compatible_headers(file_list: List[PathLike]):
@@ -15,11 +48,11 @@ def assert_cache_files_have_compatible_headers(file_list: List[PathLike]):
     Assumes that all files have been validated.
     We use the first file (file_list[0]) as our base file, and compare everything with that.
     """
-    base_file = Cache.read(file_list[0])
-
-    for file in file_list[1:]:
-        temp_file = Cache.read(file)
+    with _file_executor(file_list) as executor:
+        headers = list(executor.map(_read_cache_header, file_list))
+    base_file = headers[0]
 
+    for file, temp_file in zip(file_list[1:], headers[1:]):
         # Now the equivalence logic
 
         if base_file.version != temp_file.version:
@@ -60,33 +93,42 @@ def merge_files(cache_files: List[PathLike], output_path: PathLike):
         objective=cache.objective,
     )
 
-    # Now for each file add the cache content.
-    for file in cache_files:
-        input = Cache.read(file)
-        for line in input.lines.values():
-            tune_params = {key: line[key] for key in input.tune_params_keys}
-            output.lines.append(
-                time=line.time,
-                compile_time=line.compile_time,
-                verification_time=line.verification_time,
-                benchmark_time=line.benchmark_time,
-                strategy_time=line.strategy_time,
-                framework_time=line.framework_time,
-                timestamp=line.timestamp,
-                times=line.times,
-                GFLOP_per_s=line.GFLOP_per_s,
-                **tune_params,
-            )
+    # Copy the cache lines of each file to the output file in batches, without building the merged cache in memory
+    seen_keys = set()
+
+    def merged_cache_lines():
+        for file in cache_files:
+            for key, line in _iter_cache_lines(file):
+                if key in seen_keys:
+                    raise KeyError("Line with given tunable parameters already exists")
+                for param in output.tune_params_keys:
+                    if line[param] not in output.tune_params[param]:
+                        raise ValueError(f"Invalid value {line[param]} for tunable parameter {param}")
+                seen_keys.add(key)
+                yield key, line
+
+    _write_cache_lines_streaming(merged_cache_lines(), output_path)
 
 
 def get_line(infile: PathLike, key: str):
     """Checks if entry (string) `key` is inside file `in_file`, by using the `cache.py` library."""
-    cache_infile = Cache.read(infile)
-
-    cache_line = cache_infile.lines[key]
+    cache_line = None
+    # Unlike Cache.read, the fast paths below neither check nor convert the version, hence they are only used for cache
+    # files of the latest version
+    if os.path.getsize(infile) >= STREAMING_THRESHOLD and _read_schema_version(infile) == LATEST_VERSION:
+        # Only parse the requested cache line, located directly in the raw file content
+        cache_line = read_cache_line(infile, key)
+        if cache_line is None and ijson is not None:
+            try:
+                cache_line = _get_line_streaming(infile, key)
+            except ijson.JSONError:
+                pass  # e.g. NaN or Infinity values, which are only supported by the json module
+    if cache_line is None:
+        cache_infile = Cache.read(infile)
+        cache_line = dict(cache_infile.lines[key])
 
     print(f"[*] Cacheline entry '{key}' content [*]\n\n" f"************************")
-    print(dict(cache_line))
+    print(cache_line)
     print("************************")
 
 
@@ -100,6 +142,13 @@ def delete_line(infile: PathLike, key: str, outfile):
     if outfile is None:
         outfile = infile
 
+    if _should_stream(infile):
+        try:
+            if _delete_line_streaming(infile, key, outfile):
+                return
+        except ijson.JSONError:
+            pass  # e.g. NaN or Infinity values, which are only supported by the json module
+
     cache_infile = Cache.read(infile)
     if cache_infile.lines.get(key) is None:
         raise KeyError(f"Entry '{key}' is not contained in cachefile '{infile}'.")
@@ -130,6 +179,8 @@ def delete_line(infile: PathLike, key: str, outfile):
                 **tune_params,
             )
 
+    output.lines.flush()
+
 
 def convert(read_file: PathLike, write_file=None, target=None, allow_version_absence=False):
     """The main function for handling the version conversion of a cachefile."""
@@ -165,11 +216,153 @@ def merge(file_list: List[PathLike], outfile: PathLike):
 
     # Perform validation, conversion, equivalence check and after merge.
 
-    for i in file_list:
-        Cache.validate(i)
+    with _file_executor(file_list) as executor:
+        list(executor.map(Cache.validate, file_list))
 
     # Convert all files in `file_list` that are not matching the newest `schema_version` to the newest schema version.
     # Write the converted result to the same file.
     assert_cache_files_have_compatible_headers(file_list)
 
     merge_files(file_list, outfile)
+
+
+def _file_executor(file_list: List[PathLike]) -> ThreadPoolExecutor:
+    """Returns an executor for processing the files in ``file_list`` concurrently.
+
+    At most ``MAX_CONCURRENT_FILES`` files are processed at once, which bounds the number of parsed files in memory.
+    """
+    return ThreadPoolExecutor(max_workers=min(len(file_list), os.cpu_count() or 1, MAX_CONCURRENT_FILES))
+
+
+def _read_cache_header(filename: PathLike) -> SimpleNamespace:
+    """Returns the header properties of a cache file.
+
+    The cache file is parsed as a whole, but only its header properties are kept once this function returns.
+    """
+    cache = Cache.read(filename)
+    return SimpleNamespace(
+        version=cache.version,
+        device_name=cache.device_name,
+        kernel_name=cache.kernel_name,
+        problem_size=cache.problem_size,
+        objective=cache.objective,
+        tune_params_keys=cache.tune_params_keys,
+    )
+
+
+def _read_schema_version(filename: PathLike):
+    """Returns the schema version of a cache file without parsing its cache lines, or None if it cannot be read."""
+    header = read_cache_header(filename)
+    return None if header is None else header.get("schema_version")
+
+
+def _should_stream(filename: PathLike) -> bool:
+    """Returns whether a cache file is large enough to be streamed instead of loaded as a whole."""
+    return ijson is not None and os.path.getsize(filename) >= STREAMING_THRESHOLD
+
+
+def _iter_cache_lines(filename: PathLike) -> Iterator[Tuple[str, dict]]:
+    """Yields the (key, cache line) pairs of a cache file, streaming the file if it is large enough."""
+    if _should_stream(filename):
+        # Reading the header parses the whole file, hence whether the file can be streamed is known before any cache
+        # line is yielded
+        try:
+            is_latest_version = _read_cache_header_streaming(filename).get("schema_version") == LATEST_VERSION
+        except ijson.JSONError:
+            is_latest_version = False  # e.g. NaN or Infinity values, which are only supported by the json module
+        if is_latest_version:
+            return _iter_cache_lines_streaming(filename)
+    cache = Cache.read(filename)
+    return ((key, line.todict()) for key, line in cache.lines.items())
+
+
+def _iter_cache_lines_streaming(filename: PathLike) -> Iterator[Tuple[str, dict]]:
+    """Yields the (key, cache line) pairs of a cache file one by one, without loading the whole file."""
+    with open(filename, "rb") as file:
+        yield from ijson.kvitems(file, "cache", use_float=True)
+
+
+def _iter_valid_cache_lines_streaming(filename: PathLike) -> Iterator[Tuple[str, dict]]:
+    """Like `_iter_cache_lines_streaming`, but validates each cache line against the schema of the latest version."""
+    validator = _get_validator(LATEST_VERSION)
+    line_validator = validator.evolve(schema=validator.schema["properties"]["cache"]["additionalProperties"])
+    for key, line in _iter_cache_lines_streaming(filename):
+        # Raise the same error as Cache.validate_json would
+        error = jsonschema.exceptions.best_match(line_validator.iter_errors(line))
+        if error is not None:
+            raise error
+        yield key, line
+
+
+def _read_cache_header_streaming(filename: PathLike) -> dict:
+    """Returns the root properties of a cache file except for "cache", without building the cache lines."""
+    header: dict = {}
+    key = None
+    builder = None
+    with open(filename, "rb") as file:
+        for prefix, event, value in ijson.parse(file, use_float=True):
+            if prefix == "":
+                if builder is not None:
+                    header[key] = builder.value
+                    builder = None
+                if event == "map_key":
+                    key = value
+                    if key != "cache":
+                        builder = ijson.ObjectBuilder()
+            elif builder is not None:
+                builder.event(event, value)
+    return header
+
+
+def _write_cache_lines_streaming(cache_lines: Iterator[Tuple[str, dict]], filename: PathLike):
+    """Appends cache lines from an iterator to an existing cache file in batches."""
+    position = CachedLinePosition()
+    batch = {}
+    for key, line in cache_lines:
+        batch[key] = line
+        if len(batch) >= STREAMING_BATCH_SIZE:
+            position = append_cache_lines(batch, filename, position)
+            batch = {}
+    append_cache_lines(batch, filename, position)
+
+
+def _get_line_streaming(infile: PathLike, key: str) -> dict:
+    """Returns cache line `key` from `infile`, stopping to read the file as soon as it is found."""
+    for k, line in _iter_cache_lines_streaming(infile):
+        if k == key:
+            return line
+    raise KeyError(f"Entry '{key}' is not contained in cachefile '{infile}'.")
+
+
+def _delete_line_streaming(infile: PathLike, key: str, outfile: PathLike) -> bool:
+    """Streaming version of `delete_line` for cache files of the latest version.
+
+    The output is written to a temporary file first, such that `infile` and `outfile` can be the same file. Returns
+    False without writing anything if the cache file is not of the latest version.
+    """
+    header = _read_cache_header_streaming(infile)
+    if header.get("schema_version") != LATEST_VERSION:
+        return False
+    # Like Cache.read, the input is validated, which is done line by line while writing the output
+    Cache.validate_json({**header, "cache": {}})
+    if all(k != key for k, _ in _iter_cache_lines_streaming(infile)):
+        raise KeyError(f"Entry '{key}' is not contained in cachefile '{infile}'.")
+
+    tmp_outfile = get_temporary_filename(outfile)
+    try:
+        Cache.create(
+            tmp_outfile,
+            device_name=header["device_name"],
+            kernel_name=header["kernel_name"],
+            problem_size=header["problem_size"],
+            tune_params_keys=header["tune_params_keys"],
+            tune_params=header["tune_params"],
+            objective=header["objective"],
+        )
+        cache_lines = ((k, line) for k, line in _iter_valid_cache_lines_streaming(infile) if k != key)
+        _write_cache_lines_streaming(cache_lines, tmp_outfile)
+        replace_cache_file(tmp_outfile, outfile)
+    finally:
+        if os.path.exists(tmp_outfile):
+            os.remove(tmp_outfile)
+    return True
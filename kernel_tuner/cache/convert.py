@@ -5,8 +5,6 @@ from os import PathLike
 from pathlib import Path
 from typing import Callable
 
-import semver
-
 from kernel_tuner.cache.file import read_cache, write_cache
 from kernel_tuner.cache.json import (
     CacheFileJSON,
@@ -16,7 +14,7 @@ from kernel_tuner.cache.json import (
     T4ResultTimesJSON,
 )
 from kernel_tuner.cache.paths import CACHE_SCHEMAS_DIR
-from kernel_tuner.cache.versions import VERSIONS
+from kernel_tuner.cache.versions import VERSIONS, parse_version
 
 CONVERSION_FUNCTIONS: dict[str, Callable[[dict], dict]]
 
@@ -101,7 +99,7 @@ def convert_cache(cache : dict,
         conversion_functions = CONVERSION_FUNCTIONS
 
     if versions is None:
-        versions = list(map(str, VERSIONS))
+        versions = list(VERSIONS)
 
     if target_version is None:
         target_version = versions[-1]
@@ -111,7 +109,7 @@ def convert_cache(cache : dict,
     
     version = cache["schema_version"]
 
-    if semver.VersionInfo.parse(version).compare(target_version) > 0:
+    if parse_version(version) > parse_version(target_version):
         raise ValueError(f"Target version ({target_version}) should not be "
                          f"smaller than the cache's version ({version})")
 
@@ -155,6 +153,9 @@ def default_convert(cache       : dict,
     Returns:
         a ``dict`` representing the converted cache file.
     """
+    # semver is only imported when actually converting, such that most ktcache subcommands do not import it
+    import semver
+
     # Get the next version
     parts = ["patch", "minor", "major"]
     for part in parts:
@@ -165,10 +166,10 @@ def default_convert(cache       : dict,
     old_schema_path = schema_path / oldver / "schema.json"
     new_schema_path = schema_path / newver / "schema.json"
 
-    with open(old_schema_path) as o, open(new_schema_path) as n:
-        old_schema = json.load(o)
-        new_schema = json.load(n)
-        
+    # Parse the schemas from in-memory buffers instead of through text file objects
+    old_schema = json.loads(old_schema_path.read_bytes())
+    new_schema = json.loads(new_schema_path.read_bytes())
+
     new_cache = dict()
     for key in new_schema["properties"]:
         # It may be the case that the cache does't have a key because it is not
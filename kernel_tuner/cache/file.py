@@ -4,12 +4,31 @@ from __future__ import annotations
 
 import io
 import json
+import mmap
 import os
+import re
+import shutil
 from os import PathLike
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 from kernel_tuner.cache.json_encoder import CacheEncoder, CacheLineEncoder
 
+# orjson is an optional dependency (the "fast" extra), which parses cache files considerably faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Cache files of at least this size (in bytes) are memory-mapped instead of read into memory when orjson is installed
+MMAP_THRESHOLD = 1024 * 1024
+
+_CACHE_PROPERTY_PATTERN = re.compile(rb'[{,]\s*"cache"\s*:\s*\{')
+_PROPERTY_VALUE_PATTERN = re.compile(rb"\s*:\s*\{")
+# Matches JSON strings as a whole, such that braces inside strings are skipped when matching braces
+_BRACE_OR_STRING_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}]')
+# Matches what follows the last cache line: the closing braces of the "cache" property and of the root object
+_CACHE_END_PATTERN = re.compile(r"\s*}\s*}\s*")
+
 
 class InvalidCacheError(Exception):
     """Cache file reading or writing failed."""
@@ -39,25 +58,139 @@ def read_cache(filename: PathLike):
     Returns:
         dict: The content of the cache file.
     """
-    # Try to load the cache as both open and closed.
-    # Store whether the cache was open and properly opened
-    with open(filename, "r") as file:
-        try:  # Try load the cache as closed
-            data = json.load(file)
+    # Read the raw bytes and let the parser decode them, which is faster than decoding the file in text mode first
+    with open(filename, "rb") as file:
+        try:
+            # orjson can parse a memory-mapped file directly, without copying its content into memory first
+            if orjson is not None and os.fstat(file.fileno()).st_size >= MMAP_THRESHOLD:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer, memoryview(buffer) as view:
+                    return _parse_json(view)
+            return _parse_json(file.read())
         except json.JSONDecodeError as e:
             raise InvalidCacheError(filename, "Cache file is not parsable", e)
-    return data
 
 
-def write_cache(cache_json: dict, filename: PathLike):
+def read_cache_line(filename: PathLike, key: str) -> Optional[dict]:
+    """Reads a single cache line from a cache file, without parsing the rest of the file.
+
+    Returns None if the cache line could not be located in the file, e.g. because the file does not contain it.
+    """
+    with open(filename, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            span = find_cache_line_span(buffer, key)
+            if span is None:
+                return None
+            start, end = span
+            try:
+                return _parse_json(buffer[start:end])
+            except json.JSONDecodeError:
+                return None
+
+
+def read_cache_header(filename: PathLike) -> Optional[dict]:
+    """Reads the root properties of a cache file that precede its cache lines, without parsing the cache lines.
+
+    Returns None if the cache lines could not be located in the file, or the preceding properties are not parsable.
+    """
+    with open(filename, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            cache_match = _CACHE_PROPERTY_PATTERN.search(buffer)
+            if cache_match is None:
+                return None
+            # Close off the root object right before the "cache" property
+            content = buffer[: cache_match.start() + 1].rstrip(b",") + b"}"
+    try:
+        return _parse_json(content)
+    except json.JSONDecodeError:
+        return None
+
+
+def find_cache_line_span(buffer, key: str) -> Optional[tuple[int, int]]:
+    """Returns the start and end offsets of the object of cache line ``key`` within the raw content of a cache file.
+
+    Returns None if the cache line could not be located.
+    """
+    cache_match = _CACHE_PROPERTY_PATTERN.search(buffer)
+    if cache_match is None:
+        return None
+    # Search for the quoted key as plain bytes, which is a lot faster than searching with a regular expression
+    quoted_key = json.dumps(key).encode()
+    position = buffer.find(quoted_key, cache_match.end())
+    while position >= 0:
+        value_match = _PROPERTY_VALUE_PATTERN.match(buffer, position + len(quoted_key))
+        if value_match is not None and buffer[max(position - 64, 0) : position].rstrip()[-1:] in (b"{", b","):
+            break
+        position = buffer.find(quoted_key, position + 1)
+    else:
+        return None
+    start = value_match.end() - 1
+    depth = 0
+    for token in _BRACE_OR_STRING_PATTERN.finditer(buffer, start):
+        if token[0] == b"{":
+            depth += 1
+        elif token[0] == b"}":
+            depth -= 1
+            if depth == 0:
+                return start, token.end()
+    return None
+
+
+def _parse_json(content: Union[bytes, memoryview]):
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN or Infinity values, which are only supported by the json module
+    return json.loads(bytes(content))
+
+
+def write_cache(cache_json: dict, filename: PathLike, durable: bool = True):
     """Writes a cache file with the given content.
 
+    The content is written to a temporary file first, which then replaces the cache file, such that the cache file is
+    never left partially written.
+
     Parameters:
         cache_file (dict): The content to be written to the cache file.
         filename (PathLike): The path to write the cache file.
+        durable (bool): Whether to flush the content to disk before replacing the cache file.
+    """
+    tmp_filename = get_temporary_filename(filename)
+    try:
+        with open(tmp_filename, "w") as file:
+            json.dump(cache_json, file, cls=CacheEncoder, indent=0)
+            if durable:
+                file.flush()
+                os.fsync(file.fileno())
+        replace_cache_file(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def get_temporary_filename(filename: PathLike) -> str:
+    """Returns the name of a temporary file to write the content of cache file ``filename`` to.
+
+    The temporary file is located next to the file that ``filename`` (possibly a symbolic link) refers to, such that it
+    can replace that file using ``replace_cache_file``.
     """
-    with open(filename, "w") as file:
-        json.dump(cache_json, file, cls=CacheEncoder, indent=0)
+    return f"{os.path.realpath(filename)}.tmp-{os.getpid()}"
+
+
+def replace_cache_file(tmp_filename: PathLike, filename: PathLike):
+    """Replaces cache file ``filename`` by the temporary file ``tmp_filename``.
+
+    If ``filename`` is a symbolic link, the file it refers to is replaced instead of the link itself. The permissions of
+    an existing cache file are kept.
+    """
+    filename = os.path.realpath(filename)
+    if os.path.exists(filename):
+        shutil.copymode(filename, tmp_filename)
+    os.replace(tmp_filename, filename)
 
 
 def append_cache_line(
@@ -68,29 +201,54 @@ def append_cache_line(
     If ``position`` is unset, it will assume the "cache" property comes last in the root object when determining the
     position to insert the cache line at.
 
+    Returns the position of the next cache line.
+    """
+    return append_cache_lines({key: cache_line}, filename, position)
+
+
+def append_cache_lines(
+    cache_lines: dict, filename: PathLike, position: Optional[CachedLinePosition] = None, durable: bool = False
+) -> CachedLinePosition:
+    """Appends several cache lines to an open cache file, writing only the end of the file once.
+
+    The cache lines are given as a dictionary mapping keys to cache lines. Otherwise behaves like
+    ``append_cache_line``. If ``durable`` is set, the file is flushed to disk once after all lines have been written.
+
     Returns the position of the next cache line.
     """
     p = position or CachedLinePosition()
+    if not cache_lines:
+        return p
     if not p.is_initialized:
         _unsafe_get_next_cache_line_position(filename, p)
-    return _append_cache_line_at(key, cache_line, filename, p)
+    return _append_cache_lines_at(cache_lines, filename, p, durable)
 
 
-def _append_cache_line_at(
-    key: str, cache_line: dict, filename: PathLike, position: CachedLinePosition
+def _append_cache_lines_at(
+    cache_lines: dict, filename: PathLike, position: CachedLinePosition, durable: bool
 ) -> CachedLinePosition:
     with open(filename, "r+") as file:
         # Save cache closing braces properties coming after "cache" as text in suffix
         file.seek(position.file_position)
         after_text = file.read()
-
-        # Append the cache line at the right position in the file
+        if not _CACHE_END_PATTERN.fullmatch(after_text):
+            # The file has been changed since the position was determined, e.g. rewritten in a way that its modification
+            # time and size did not reveal, so the end of the cache is searched again
+            position = CachedLinePosition()
+            _unsafe_get_next_cache_line_position(filename, position)
+            file.seek(position.file_position)
+            after_text = file.read()
+
+        # Append the cache lines at the right position in the file
         file.seek(position.file_position)
         text = ""
-        if not position.is_first_line:
-            text += ","
-        text += "\n"
-        text += json.dumps({key: cache_line}, cls=CacheLineEncoder).strip()[1:-1]
+        is_first_line = position.is_first_line
+        for key, cache_line in cache_lines.items():
+            if not is_first_line:
+                text += ","
+            text += "\n"
+            text += json.dumps({key: cache_line}, cls=CacheLineEncoder).strip()[1:-1]
+            is_first_line = False
         file.write(text)
 
         # Update the position
@@ -102,6 +260,9 @@ def _append_cache_line_at(
         # Close off the cache
         file.write(after_text)
         file.truncate()
+        if durable:
+            file.flush()
+            os.fsync(file.fileno())
 
     return next_pos
 
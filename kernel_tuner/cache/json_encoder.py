@@ -132,6 +132,16 @@ class CacheEncoder(json.JSONEncoder):
         ###   strings to json strings in cases this c interface exists
         _encoder = super().encode
         ### END MODIFICATION
+        ### MODIFICATION: cache lines are encoded on a single line as a whole, by the C accelerated CacheLineEncoder
+        _encode_cache_line = CacheLineEncoder(
+            skipkeys=self.skipkeys,
+            ensure_ascii=self.ensure_ascii,
+            check_circular=self.check_circular,
+            allow_nan=self.allow_nan,
+            sort_keys=self.sort_keys,
+            default=self.default,
+        ).encode
+        ### END MODIFICATION
 
         def floatstr(o, allow_nan=self.allow_nan, _repr=float.__repr__, _inf=INFINITY, _neginf=-INFINITY):
             # Check for specials.  Note that this type of test is processor
@@ -156,6 +166,7 @@ class CacheEncoder(json.JSONEncoder):
             markers,
             self.default,
             _encoder,
+            _encode_cache_line,
             self.indent,
             floatstr,
             self.key_separator,
@@ -171,6 +182,7 @@ def _make_iterencode(
     markers,
     _default,
     _encoder,
+    _encode_cache_line,
     _indent,
     _floatstr,
     _key_separator,
@@ -342,6 +354,10 @@ def _make_iterencode(
             elif isinstance(value, float):
                 # see comment for int/float in _make_iterencode
                 yield _floatstr(value)
+            ### MODIFICATION: encode cache lines as a whole
+            elif _current_path == ("cache",) and isinstance(value, dict):
+                yield _encode_cache_line(value)
+            ### END MODIFICATION
             else:
                 ### MODIFICATION: pass item_path instead of _current_indent_level
                 item_path = _current_path + (key,)
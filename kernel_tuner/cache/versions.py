@@ -2,10 +2,26 @@
 
 from __future__ import annotations
 
-from semver import Version
+import re
 
 from .paths import CACHE_SCHEMAS_DIR
 
-SORTED_VERSIONS: list[Version] = sorted(Version.parse(p.name) for p in CACHE_SCHEMAS_DIR.iterdir())
-VERSIONS: list[Version] = SORTED_VERSIONS
-LATEST_VERSION: Version = VERSIONS[-1]
+_VERSION_PATTERN = re.compile(r"(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)\.(0|[1-9][0-9]*)")
+
+
+def parse_version(version: str) -> tuple[int, int, int]:
+    """Parses a version of the form MAJOR.MINOR.PATCH into a tuple of integers.
+
+    Cache files only use such versions, so this is a lot cheaper than parsing the version using semver. Raises a
+    ValueError if ``version`` is not of this form.
+    """
+    match = _VERSION_PATTERN.fullmatch(version)
+    if match is None:
+        raise ValueError(f"Invalid version {version!r}")
+    major, minor, patch = match.groups()
+    return int(major), int(minor), int(patch)
+
+
+SORTED_VERSIONS: list[str] = sorted((p.name for p in CACHE_SCHEMAS_DIR.iterdir()), key=parse_version)
+VERSIONS: list[str] = SORTED_VERSIONS
+LATEST_VERSION: str = VERSIONS[-1]
@@ -678,6 +678,10 @@ def tune_kernel(
     results = strategy.tune(searchspace, runner, tuning_options)
     env = runner.get_environment(tuning_options)
 
+    # write the remaining cache lines to the cachefile
+    if tuning_options.cachefile:
+        tuning_options.cache.flush()
+
     # finished iterating over search space
     if results:  # checks if results is not empty
         best_config = util.get_best_config(results, objective, objective_higher_is_better)
@@ -45,60 +45,51 @@ We can:
 # import required files from within kernel tuner
 import argparse
 import sys
+from functools import lru_cache
+from typing import Optional
 
-from kernel_tuner.cache.cli_tools import convert, convert_t4, delete_line, get_line, merge
 
+# NOTE: kernel_tuner.cache.cli_tools is imported within the cli_* functions, such that only the code needed for the
+# chosen subcommand is imported.
 
 def cli_convert(ap_res: argparse.Namespace):
     """The main function for handling conversion to a `schema_version` in the cli."""
+    from kernel_tuner.cache.cli_tools import convert
+
     convert(ap_res.infile, write_file=ap_res.output, target=ap_res.target, \
             allow_version_absence=ap_res.allow_version_absence)
 
 
 def cli_delete_line(ap_res: argparse.Namespace):
     """The main function for handling deletion of a cacheline using `delete-line` in the cli."""
+    from kernel_tuner.cache.cli_tools import delete_line
+
     delete_line(ap_res.infile[0], ap_res.key, outfile=ap_res.output)
 
 
 def cli_getline(ap_res: argparse.Namespace):
     """The main function for getting a line using `get-line` in the cli."""
+    from kernel_tuner.cache.cli_tools import get_line
+
     get_line(ap_res.infile[0], ap_res.key)
     
 
 def cli_merge(ap_res: argparse.Namespace):
     """The main function for merging several cachefiles using `merge` in the cli."""
+    from kernel_tuner.cache.cli_tools import merge
+
     merge(ap_res.files, ap_res.output)
 
 
 def cli_t4(ap_res: argparse.Namespace):
     """The main function for handling conversion to t4 format in the cli."""
-    convert_t4(ap_res.infile, write_file=ap_res.output)
-
-
-def parse_args(args):
-    """The main parsing function.
-
-    Uses argparse to parse, then calls the appropiate function, one of:
-    cli_{convert, delete-line, get-line, merge}.
-    """
-	# Setup parsing
+    from kernel_tuner.cache.cli_tools import convert_t4
 
-    parser = argparse.ArgumentParser(
-		prog="ktcache",
-		description="A CLI tool to manipulate kernel tuner cache files.",
-		epilog="Example usages:\n\n" \
-        "ktcache convert --in a.json -T 1.1.0 --out b.json\n" \
-        "ktcache convert --in a.json -T 1.1.0 --out b.json --allow-version-absence\n" \
-        "ktcache delete-line 1.json --key 1,2,3,4 --out 2.json\n" \
-        "ktcache get-line file.json --key 1,2,3,4\n" \
-        "ktcache t4 --in x.json --out y.json\n" \
-        "ktcache merge 1.json 2.json 3.json --out 4.json\n\n",
-        formatter_class=argparse.RawDescriptionHelpFormatter)
+    convert_t4(ap_res.infile, write_file=ap_res.output)
 
-    sp = parser.add_subparsers(required=True,
-                               help="Possible subcommands: 'convert', 'delete-line', 'get-line' and 'inspect'.")
-    
 
+def add_convert_parser(sp):
+    """Adds the parser of the `convert` subcommand to subparsers ``sp``."""
     convert = sp.add_parser("convert", help="Convert a cache file from one version to another.")
     convert.add_argument("--in", "--infile", 
                     required=True, 
@@ -113,6 +104,9 @@ def parse_args(args):
                     help="Allow unversioned cachefiles to be converted.")
     convert.set_defaults(func=cli_convert)
 
+
+def add_t4_parser(sp):
+    """Adds the parser of the `t4` subcommand to subparsers ``sp``."""
     t4 = sp.add_parser("t4", help="Convert a cache file to the T4 auto-tuning format.")
     t4.add_argument("--in", "--infile", 
                     required=True, 
@@ -123,7 +117,10 @@ def parse_args(args):
                     help="The output JSON file to write to.", 
                     dest="output")
     t4.set_defaults(func=cli_t4)
-    
+
+
+def add_delete_line_parser(sp):
+    """Adds the parser of the `delete-line` subcommand to subparsers ``sp``."""
     delete = sp.add_parser("delete-line", help="Delete a certain cacheline entry from the specified cachefile.")
     delete.add_argument("infile", 
                     nargs=1, 
@@ -135,7 +132,10 @@ def parse_args(args):
                     help="The (optional) output file to write the updated cachefile to.", 
                     dest="output")
     delete.set_defaults(func=cli_delete_line)
-    
+
+
+def add_get_line_parser(sp):
+    """Adds the parser of the `get-line` subcommand to subparsers ``sp``."""
     get = sp.add_parser("get-line", help="Get a certain cacheline entry from the specified cachefile.")
     get.add_argument("infile", 
                     nargs=1, 
@@ -144,21 +144,72 @@ def parse_args(args):
                     required=True, 
                     help="The (potential) key of the (potential) cacheline entry to get.")
     get.set_defaults(func=cli_getline)
-    
+
+
+def add_merge_parser(sp):
+    """Adds the parser of the `merge` subcommand to subparsers ``sp``."""
     merge = sp.add_parser("merge", help="Merge two or more cachefiles.")
     merge.add_argument("files", 
                     nargs="+",
-					help="The cachefiles to merge (minimum two). They must be of the same version, and " \
+                    help="The cachefiles to merge (minimum two). They must be of the same version, and " \
                          "contain equivalent metadata.")
     merge.add_argument("-o", "--out", "--output", 
                     required=True,
-					help="The output file to write the merged cachefiles to.", 
+                    help="The output file to write the merged cachefiles to.", 
                     dest="output")
     merge.set_defaults(func=cli_merge)
-    
+
+
+SUBCOMMAND_PARSERS = {
+    "convert": add_convert_parser,
+    "t4": add_t4_parser,
+    "delete-line": add_delete_line_parser,
+    "get-line": add_get_line_parser,
+    "merge": add_merge_parser,
+}
+
+
+def parse_args(args):
+    """The main parsing function.
+
+    Uses argparse to parse, then calls the appropiate function, one of:
+    cli_{convert, delete-line, get-line, merge}.
+    """
+    # Only the parser of the given subcommand is needed, unless e.g. the help message or an error should be shown.
+    subcommand = args[0] if len(args) > 0 and args[0] in SUBCOMMAND_PARSERS else None
 
     # Parse input and call the appropiate function.
-    return parser.parse_args(args)
+    return _build_parser(subcommand).parse_args(args)
+
+
+@lru_cache(maxsize=None)
+def _build_parser(subcommand: Optional[str]) -> argparse.ArgumentParser:
+    """Builds the parser with only the parser of ``subcommand``, or of all subcommands if it is None.
+
+    Parsers are built once and reused when parsing arguments again.
+    """
+    parser = argparse.ArgumentParser(
+        prog="ktcache",
+        description="A CLI tool to manipulate kernel tuner cache files.",
+        epilog="Example usages:\n\n" \
+        "ktcache convert --in a.json -T 1.1.0 --out b.json\n" \
+        "ktcache convert --in a.json -T 1.1.0 --out b.json --allow-version-absence\n" \
+        "ktcache delete-line 1.json --key 1,2,3,4 --out 2.json\n" \
+        "ktcache get-line file.json --key 1,2,3,4\n" \
+        "ktcache t4 --in x.json --out y.json\n" \
+        "ktcache merge 1.json 2.json 3.json --out 4.json\n\n",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    sp = parser.add_subparsers(required=True,
+                               help="Possible subcommands: 'convert', 'delete-line', 'get-line' and 'inspect'.")
+
+    if subcommand is not None:
+        SUBCOMMAND_PARSERS[subcommand](sp)
+    else:
+        for add_subcommand_parser in SUBCOMMAND_PARSERS.values():
+            add_subcommand_parser(sp)
+
+    return parser
 
 
 def main():
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import time
 import pytest
 import shutil
 import json
@@ -10,8 +11,9 @@ from datetime import datetime
 from types import SimpleNamespace
 from typing import cast
 
+import kernel_tuner.cache.cache
 import kernel_tuner.util as util
-from kernel_tuner.cache.file import write_cache
+from kernel_tuner.cache.file import read_cache, write_cache
 from kernel_tuner.cache.cache import Cache
 from kernel_tuner.cache.versions import LATEST_VERSION
 
@@ -164,6 +166,11 @@ class TestCache:
         assert len(cache.lines.get(b=2)) == 0
         assert len(cache.lines.get(a=0)) == 3
 
+    def test_lines_get__multiple_after_append(self, cache, full_cache_line):
+        assert len(cache.lines.get(a=1)) == 1
+        cache.lines.append(**vars(full_cache_line))
+        assert len(cache.lines.get(a=1)) == 2
+
     def test_lines_get__no_KeyError(self, cache):
         cache.lines.get("gibberish")
 
@@ -182,6 +189,14 @@ class TestCache:
         assert cache_line_read.framework_time == 7
         assert cache_line_read.timestamp == now
 
+    def test_line_attributes__converted_once(self, cache_line_read):
+        assert cache_line_read.timestamp is cache_line_read.timestamp
+        assert cache_line_read.time is cache_line_read.time
+
+    def test_line__has_no_instance_dict(self, cache_line_read):
+        with pytest.raises(AttributeError):
+            cache_line_read.some_attribute = 0
+
     def test_line_dict(self, cache_line_read, cache_json, now):
         assert "GFLOP/s" not in cache_line_read
         assert dict(cache_line_read) == {
@@ -245,6 +260,7 @@ class TestCache:
         prev_len = len(cache.lines)
         cache.lines.append(**vars(cache_line))
         assert len(cache.lines) == prev_len + 1
+        cache.lines.flush()
         cache = Cache.open(cache.filepath)
         assert len(cache.lines) == prev_len + 1
 
@@ -257,6 +273,64 @@ class TestCache:
     def test_line_append(self, full_cache_line, assert_can_append_line):
         pass
 
+    def test_line_append__flush(self, cache, full_cache_line):
+        cache.lines.append(**vars(full_cache_line))
+        assert "1,1,1" not in Cache.open(cache.filepath).lines
+        cache.lines.flush()
+        assert "1,1,1" in Cache.open(cache.filepath).lines
+
+    def test_is_stale(self, cache, full_cache_line):
+        assert not cache.is_stale()
+        cache.lines.append(**vars(full_cache_line))
+        cache.lines.flush()
+        assert cache.revision == 1
+        assert not cache.is_stale()
+        os.utime(cache.filepath, ns=(0, 0))
+        assert cache.is_stale()
+
+    def test_line_append__flush_after_failed_flush(self, cache, full_cache_line, monkeypatch):
+        def append_cache_lines(*args, **kwargs):
+            raise OSError("No space left on device")
+
+        cache.lines.append(**vars(full_cache_line))
+        with monkeypatch.context() as m:
+            m.setattr("kernel_tuner.cache.cache.append_cache_lines", append_cache_lines)
+            with pytest.raises(OSError):
+                cache.lines.flush()
+        cache.lines.flush()
+        assert "1,1,1" in Cache.open(cache.filepath).lines
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_line_append__timer_flush_after_failed_flush(self, cache, full_cache_line, monkeypatch):
+        failures = [OSError("No space left on device")]
+
+        def append_cache_lines(*args, **kwargs):
+            if failures:
+                raise failures.pop()
+            return real_append_cache_lines(*args, **kwargs)
+
+        real_append_cache_lines = kernel_tuner.cache.cache.append_cache_lines
+        monkeypatch.setattr(Cache, "FLUSH_INTERVAL", 0.01)
+        monkeypatch.setattr("kernel_tuner.cache.cache.append_cache_lines", append_cache_lines)
+        cache.lines.append(**vars(full_cache_line))
+        deadline = time.monotonic() + 5.0
+        while cache.revision == 0:
+            assert time.monotonic() < deadline, "the pending line is not written after a failed timer flush"
+            time.sleep(0.01)
+        assert not failures
+        assert "1,1,1" in Cache.open(cache.filepath).lines
+
+    def test_line_append__flush_after_external_rewrite(self, cache, full_cache_line):
+        cache.lines.append(**vars(full_cache_line))
+        cache.lines.flush()
+        # Rewrite the file other than through the cache, such that the end of the cache lines moves
+        cache_json = read_cache(cache.filepath)
+        del cache_json["cache"]["0,0,0"]
+        write_cache(cache_json, cache.filepath)
+        cache.lines.append(**{**vars(full_cache_line), "b": 0})
+        cache.lines.flush()
+        assert list(read_cache(cache.filepath)["cache"]) == ["0,0,1", "0,1,0", "1,1,0", "1,1,1", "1,0,1"]
+
     def test_line_append__with_ErrorConfig(self, full_cache_line, assert_can_append_line):
         full_cache_line.time = util.InvalidConfig()
 
@@ -309,6 +383,11 @@ class TestCache:
         cache = Cache.read(cache_file)
         cache.lines.append(**vars(full_cache_line))
 
+    def test_read__lines_are_readonly_view(self, cache_file):
+        cache = Cache.read(cache_file)
+        with pytest.raises(TypeError):
+            cache.lines._lines["1,1,1"] = {}
+
     def test_read__outdated(self):
         cache = Cache.read(XXL_CACHE_PATH)
         assert len(cache.lines) > 100
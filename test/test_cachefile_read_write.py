@@ -1,5 +1,6 @@
 import pytest
 import shutil
+import stat
 from copy import deepcopy
 from pathlib import Path
 
@@ -7,8 +8,11 @@ from kernel_tuner.cache.file import (
     InvalidCacheError,
     CachedLinePosition,
     read_cache,
+    read_cache_header,
+    read_cache_line,
     write_cache,
     append_cache_line,
+    append_cache_lines,
 )
 
 
@@ -52,6 +56,38 @@ def test_read_cache__which_is_unparsable(output_path):
         read_cache(output_path)
 
 
+def test_read_cache__with_non_finite_numbers(output_path):
+    with open(output_path, "w") as file:
+        file.write('{"nan": NaN, "inf": Infinity}')
+
+    content = read_cache(output_path)
+    assert content["nan"] != content["nan"]
+    assert content["inf"] == float("inf")
+
+
+def test_read_cache_line(cache_path):
+    cache_lines = read_cache(cache_path)["cache"]
+
+    for key in list(cache_lines)[:: max(len(cache_lines) // 10, 1)]:
+        assert read_cache_line(cache_path, key) == cache_lines[key]
+    assert read_cache_line(cache_path, "nonexistent") is None
+
+
+def test_read_cache_line__with_braces_in_strings(output_path):
+    with open(output_path, "w") as file:
+        file.write('{"cache": {"a": {"x": "}{\\"", "y": {"z": 1}}, "b": {"x": ", \\"b\\": {"}}}')
+
+    assert read_cache_line(output_path, "a") == {"x": '}{"', "y": {"z": 1}}
+    assert read_cache_line(output_path, "b") == {"x": ', "b": {'}
+
+
+def test_read_cache_header(cache_path):
+    cache = read_cache(cache_path)
+    del cache["cache"]
+
+    assert read_cache_header(cache_path) == cache
+
+
 def test_write_cache(cache_path, output_path):
     sample_cache = read_cache(cache_path)
 
@@ -60,6 +96,30 @@ def test_write_cache(cache_path, output_path):
         assert output.read().rstrip() == input.read().rstrip()
 
 
+def test_write_cache__replaces_existing_file(output_path):
+    output_path.write_text("INVALID")
+
+    write_cache({"cache": {}}, output_path, durable=False)
+
+    assert read_cache(output_path) == {"cache": {}}
+    assert list(output_path.parent.iterdir()) == [output_path]
+
+
+def test_write_cache__keeps_symlink_and_mode(tmp_path):
+    target_path = tmp_path / "target.json"
+    link_path = tmp_path / "link.json"
+    target_path.write_text("INVALID")
+    target_path.chmod(0o640)
+    link_path.symlink_to(target_path)
+
+    write_cache({"cache": {}}, link_path, durable=False)
+
+    assert link_path.is_symlink()
+    assert read_cache(target_path) == {"cache": {}}
+    assert stat.S_IMODE(target_path.stat().st_mode) == 0o640
+    assert sorted(tmp_path.iterdir()) == sorted([link_path, target_path])
+
+
 def test_append_cache_line(cache_path, output_path):
     sample_cache = read_cache(cache_path)
 
@@ -100,3 +160,37 @@ def test_append_cache_line__to_empty_cache(cache_path, output_path):
         append_cache_line(key, line, output_path)
 
     assert read_cache(output_path) == sample_cache
+
+
+def test_append_cache_lines(cache_path, output_path):
+    sample_cache = read_cache(cache_path)
+
+    empty_cache = deepcopy(sample_cache)
+    cache_lines = deepcopy(empty_cache["cache"])
+    empty_cache["cache"].clear()
+    write_cache(empty_cache, output_path)
+
+    keys = list(cache_lines.keys())
+    half = len(keys) // 2
+    pos = append_cache_lines({key: cache_lines[key] for key in keys[:half]}, output_path)
+    append_cache_lines({key: cache_lines[key] for key in keys[half:]}, output_path, pos)
+
+    assert read_cache(output_path) == sample_cache
+
+
+def test_append_cache_lines__outdated_position(cache_path, output_path):
+    sample_cache = read_cache(cache_path)
+
+    empty_cache = deepcopy(sample_cache)
+    cache_lines = deepcopy(empty_cache["cache"])
+    empty_cache["cache"].clear()
+    write_cache(empty_cache, output_path)
+
+    keys = list(cache_lines.keys())
+    half = len(keys) // 2
+    pos = append_cache_lines({key: cache_lines[key] for key in keys[:half]}, output_path)
+    # Rewrite the file with fewer cache lines, such that the position now points past the end of the cache
+    write_cache({**empty_cache, "cache": {keys[0]: cache_lines[keys[0]]}}, output_path)
+    append_cache_lines({key: cache_lines[key] for key in keys[half:]}, output_path, pos)
+
+    assert read_cache(output_path)["cache"] == {key: cache_lines[key] for key in keys[:1] + keys[half:]}
@@ -1,14 +1,31 @@
 import json
+import mmap
+import os
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from shutil import copyfile
+from types import MappingProxyType
 
 import jsonschema
 import pytest
 
-from kernel_tuner.cache.convert import convert_cache_file, convert_cache_to_t4, default_convert, unversioned_convert
+from kernel_tuner.cache.convert import (
+    convert_cache,
+    convert_cache_file,
+    convert_cache_to_t4,
+    default_convert,
+    unversioned_convert,
+)
 from kernel_tuner.cache.paths import CACHE_SCHEMAS_DIR, SCHEMA_DIR
 from kernel_tuner.cache.versions import VERSIONS
 
+# orjson is optional, but parses the test files considerably faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 TEST_PATH         = Path(__file__).parent
 TEST_CONVERT_PATH = TEST_PATH / "test_convert_files"
 
@@ -39,107 +56,207 @@ T4_CACHE = TEST_CONVERT_PATH / "t4_cache.json"
 T4_TARGET = TEST_CONVERT_PATH / "t4_target.json"
 
 
+def _load(path):
+    """Parses the JSON file at ``path``, which is read at once as bytes instead of as text."""
+    content = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _stage(src, dst):
+    """Makes the file ``src`` available at ``dst``, by hard linking it if possible instead of copying it.
+
+    This relies on convert_cache_file never writing to the cache file in place, which would also modify ``src``: the
+    cache file is replaced by a new file instead. An existing file at ``dst`` is overwritten.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        copyfile(src, dst)
+
+
+def _mmap_load(path):
+    """Like ``_load``, but lets orjson parse a memory map of the file instead of a copy of its content."""
+    if orjson is None:
+        return _load(path)
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        with memoryview(buffer) as view:
+            return orjson.loads(view)
+
+
+@lru_cache(maxsize=None)
+def _load_shared(path):
+    """Like ``_load``, but parses each file only once. The result is shared, so it should not be modified."""
+    return _load(path)
+
+
+def _canonical(obj):
+    """Serializes ``obj`` with sorted keys, such that equal objects are serialized to equal bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True).encode()
+
+
+# Schemas (and the T4 target) are only read by the tests, so they are parsed once per session. Fixtures of the same
+# file, like those of the oldest and newest schema when there is only one version, share the parsed file and its
+# validator.
+@pytest.fixture(scope="session")
+def mock_schema_old():
+    return _load_shared(MOCK_SCHEMA_OLD)
+
+
+@pytest.fixture(scope="session")
+def mock_schema_new():
+    return _load_shared(MOCK_SCHEMA_NEW)
+
+
+@pytest.fixture(scope="session")
+def upgraded_schema():
+    return _load_shared(UPGRADED_SCHEMA)
+
+
+@pytest.fixture(scope="session")
+def schema_old():
+    return _load_shared(SCHEMA_OLD)
+
+
+@pytest.fixture(scope="session")
+def schema_new():
+    return _load_shared(SCHEMA_NEW)
+
+
+@pytest.fixture(scope="session")
+def t4_schema():
+    return _load_shared(T4_SCHEMA)
+
+
+@pytest.fixture(scope="session")
+def t4_result_schema(t4_schema):
+    """Schema of a single result of a T4 file."""
+    return {"$schema": t4_schema["$schema"], **t4_schema["properties"]["results"]["items"]}
+
+
+@pytest.fixture(scope="session")
+def t4_envelope_schema(t4_schema):
+    """Schema of a T4 file without the schema of its results, which are validated one by one instead."""
+    results_schema = {key: value for key, value in t4_schema["properties"]["results"].items() if key != "items"}
+    return {**t4_schema, "properties": {**t4_schema["properties"], "results": results_schema}}
+
+
+@pytest.fixture(scope="session")
+def t4_target():
+    return _load_shared(T4_TARGET)
+
+
+# Formats are checked like when Cache validates cache files, for which a date-time is any ISO 8601 timestamp
+_FORMAT_CHECKER = jsonschema.FormatChecker()
+
+
+@_FORMAT_CHECKER.checks("date-time")
+def _check_iso_datetime(instance):
+    try:
+        datetime.fromisoformat(instance)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+# Validators of the shared schemas, by the id of the schema
+_VALIDATORS = {}
+
+
+def _validator(schema):
+    """Returns a validator for ``schema``, which is created only once per schema.
+
+    Formats are checked like when Cache validates cache files.
+    """
+    validator = _VALIDATORS.get(id(schema))
+    if validator is None:
+        jsonschema.Draft202012Validator.check_schema(schema)
+        validator = jsonschema.Draft202012Validator(schema, format_checker=_FORMAT_CHECKER)
+        _VALIDATORS[id(schema)] = validator
+    return validator
+
+
+@pytest.fixture(scope="module")
+def shared_tmp(tmp_path_factory):
+    """Temporary directory shared by the tests of this module, each test overwrites the files it uses."""
+    return tmp_path_factory.mktemp("convert_cache", numbered=False)
+
 
 class TestConvertCache:
     # Test using mock schema/cache files and conversion functions
-    def test_conversion_system(self, tmp_path):
-        TEST_COPY = tmp_path / "temp_cache.json"
-        copyfile(MOCK_CACHE_FILE, TEST_COPY)
-
-        with open(TEST_COPY) as c, open(MOCK_SCHEMA_OLD) as s:
-            mock_cache  = json.load(c)
-            mock_schema = json.load(s)
-            jsonschema.validate(mock_cache, mock_schema)
+    # The conversion itself is tested in memory, only test_convert_real converts a cache file on disk
+    def test_conversion_system(self, mock_schema_old, mock_schema_new):
+        mock_cache  = _load(MOCK_CACHE_FILE)
+        _validator(mock_schema_old).validate(mock_cache)
         
-        convert_cache_file(TEST_COPY, 
-                           self._CONVERT_FUNCTIONS,
-                           self._VERSIONS)
-
-        with open(TEST_COPY) as c, open(MOCK_SCHEMA_NEW) as s:
-            mock_cache  = json.load(c)
-            mock_schema = json.load(s)
-            jsonschema.validate(mock_cache, mock_schema)
+        mock_cache  = convert_cache(mock_cache,
+                                    self._CONVERT_FUNCTIONS,
+                                    self._VERSIONS)
+
+        _validator(mock_schema_new).validate(mock_cache)
     
     # Test using implemented schema/cache files and conversion functions
-    def test_convert_real(self, tmp_path):
-        TEST_COPY = tmp_path / "temp_cache.json"
-        copyfile(REAL_CACHE_FILE, TEST_COPY)
-
-        with open(TEST_COPY) as c, open(SCHEMA_OLD) as s:
-            real_cache  = json.load(c)
-            real_schema = json.load(s)
-            jsonschema.validate(real_cache, real_schema)
+    def test_convert_real(self, shared_tmp, schema_old, schema_new):
+        TEST_COPY = str(shared_tmp / "temp_cache.json")
+        _stage(REAL_CACHE_FILE, TEST_COPY)
+
+        real_cache  = _mmap_load(TEST_COPY)
+        _validator(schema_old).validate(real_cache)
         
         convert_cache_file(TEST_COPY)
+        assert not os.path.samefile(TEST_COPY, REAL_CACHE_FILE)
 
-        with open(TEST_COPY) as c, open(SCHEMA_NEW) as s:
-            real_cache  = json.load(c)
-            real_schema = json.load(s)
-            jsonschema.validate(real_cache, real_schema)
+        real_cache  = _mmap_load(TEST_COPY)
+        _validator(schema_new).validate(real_cache)
     
-    def test_no_version_field(self, tmp_path):
-        TEST_COPY = tmp_path / "temp_cache.json"
-        copyfile(NO_VERSION_FIELD, TEST_COPY)
-
-        with open(TEST_COPY) as c:
-            cache = json.load(c)
+    def test_no_version_field(self, mock_schema_old):
+        cache = _load(NO_VERSION_FIELD)
 
         cache = unversioned_convert(cache, MOCK_SCHEMAS_PATH)
         
-        with open(MOCK_SCHEMA_OLD) as s:
-            schema = json.load(s)
-            jsonschema.validate(cache, schema)
-
-    def test_too_high_version(self, tmp_path):
-        TEST_COPY = tmp_path / "temp_cache.json"
-        copyfile(TOO_HIGH_VERSION, TEST_COPY)
+        _validator(mock_schema_old).validate(cache)
 
-        with pytest.raises(ValueError):
-            convert_cache_file(TEST_COPY,
-                               self._CONVERT_FUNCTIONS,
-                               self._VERSIONS)
-            
-    def test_not_real_version(self, tmp_path):
-        TEST_COPY = tmp_path / "temp_cache.json"
-        copyfile(NOT_REAL_VERSION, TEST_COPY)
+    @pytest.mark.parametrize("cache_file", [TOO_HIGH_VERSION, NOT_REAL_VERSION],
+                             ids=["too_high_version", "not_real_version"])
+    def test_invalid_version(self, cache_file):
+        cache = _load(cache_file)
 
         with pytest.raises(ValueError):
-            convert_cache_file(TEST_COPY,
-                               self._CONVERT_FUNCTIONS,
-                               self._VERSIONS)
+            convert_cache(cache,
+                          self._CONVERT_FUNCTIONS,
+                          self._VERSIONS)
             
-    def test_default_convert(self):
-        with open(MOCK_CACHE_FILE) as c:
-            cache = json.load(c)
+    def test_default_convert(self, upgraded_schema):
+        cache = _load(MOCK_CACHE_FILE)
     
         cache = default_convert(cache,
                                 "1.0.0",
                                 self._VERSIONS,
                                 MOCK_SCHEMAS_PATH)
 
-        with open(UPGRADED_SCHEMA) as s:
-            upgraded_schema = json.load(s)
-            jsonschema.validate(cache, upgraded_schema)
+        _validator(upgraded_schema).validate(cache)
     
-    def test_convert_to_t4(self):
-        with open(T4_CACHE) as cache_file, open(T4_TARGET) as t4_target_file:
-            cache = json.load(cache_file)
-            t4_target = json.load(t4_target_file)
+    def test_convert_to_t4(self, t4_target):
+        cache = _mmap_load(T4_CACHE)
         
         t4 = convert_cache_to_t4(cache)
 
-        if (t4 != t4_target):
-            raise ValueError("Converted T4 does not match target T4")
+        assert _canonical(t4) == _canonical(t4_target), "Converted T4 does not match target T4"
     
-    def test_convert_to_t4_is_valid(self):
-        with open(T4_CACHE) as cache_file:
-            cache = json.load(cache_file)
+    def test_convert_to_t4_is_valid(self, t4_envelope_schema, t4_result_schema):
+        cache = _mmap_load(T4_CACHE)
 
         t4_converted_output = convert_cache_to_t4(cache)
 
-        with open(T4_SCHEMA) as t4_schema_file:
-            t4_schema = json.load(t4_schema_file)
-            jsonschema.validate(t4_converted_output, t4_schema)
+        _validator(t4_envelope_schema).validate(t4_converted_output)
+        result_validator = _validator(t4_result_schema)
+        for result in t4_converted_output["results"]:
+            result_validator.validate(result)
 
     
     # Mock convert functions
@@ -160,15 +277,16 @@ class TestConvertCache:
         cache["schema_version"] = "1.2.0"
         return cache
 
-    _CONVERT_FUNCTIONS = {
+    # convert_cache looks up the conversion function by version, so the chain is kept as a (readonly) mapping
+    _CONVERT_FUNCTIONS = MappingProxyType({
         "1.0.0": _c1_0_0_to_1_1_0.__func__,
         "1.1.0": _c1_1_0_to_1_1_1.__func__,
         "1.1.1": _c1_1_1_to_1_2_0.__func__, 
-    }
+    })
 
-    _VERSIONS = [
+    _VERSIONS = (
         "1.0.0",
         "1.1.0",
         "1.1.1",
         "1.2.0"
-    ]
\ No newline at end of file
+    )
\ No newline at end of file
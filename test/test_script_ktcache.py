@@ -5,8 +5,9 @@ from shutil import copyfile
 import jsonschema
 import pytest
 
+import kernel_tuner.cache.cli_tools as cli_tools
 from kernel_tuner.scripts.ktcache import parse_args
-from kernel_tuner.cache.file import read_cache
+from kernel_tuner.cache.file import read_cache, write_cache
 from kernel_tuner.cache.paths import CACHE_SCHEMAS_DIR
 from kernel_tuner.cache.versions import VERSIONS
 from kernel_tuner.cache.convert import convert_cache_file
@@ -128,6 +129,53 @@ class TestCli:
 
         assert delete_result == small_content
 
+    @pytest.fixture
+    def streaming(self, monkeypatch):
+        pytest.importorskip("ijson")
+        monkeypatch.setattr(cli_tools, "STREAMING_THRESHOLD", 0)
+        monkeypatch.setattr(cli_tools, "STREAMING_BATCH_SIZE", 1)
+
+    def test_deleteline_valid_key__streaming(self, tmp_path, streaming):
+        TEST_SMALL_CACHEFILE_THREE_ENTRIES_SRC = TEST_CACHE_PATH / "small_cache_three_entries.json"
+        TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST = tmp_path / "small_cache_three_entries.json"
+
+        TEST_SMALL_CACHEFILE_SRC = TEST_CACHE_PATH / "small_cache.json"
+        TEST_SMALL_CACHEFILE_DST = tmp_path / "small_cache.json"
+
+        copyfile(TEST_SMALL_CACHEFILE_THREE_ENTRIES_SRC, TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+        copyfile(TEST_SMALL_CACHEFILE_SRC, TEST_SMALL_CACHEFILE_DST)
+
+        convert_cache_file(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+        convert_cache_file(TEST_SMALL_CACHEFILE_DST)
+
+        parser = parse_args(["delete-line", str(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST), "--key", "32,1"])
+
+        parser.func(parser)
+
+        delete_result = read_cache(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+        small_content = read_cache(TEST_SMALL_CACHEFILE_DST)
+
+        assert delete_result == small_content
+        # The temporary output file has been moved over the input file
+        assert sorted(tmp_path.iterdir()) == sorted([TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST, TEST_SMALL_CACHEFILE_DST])
+
+    def test_deleteline_invalid_line__streaming(self, tmp_path, streaming):
+        TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST = tmp_path / "small_cache_three_entries.json"
+
+        copyfile(TEST_CACHE_PATH / "small_cache_three_entries.json", TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+        convert_cache_file(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+        cache = read_cache(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+        cache["cache"]["16,1"]["compile_time"] = "not a number"
+        write_cache(cache, TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+
+        parser = parse_args(["delete-line", str(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST), "--key", "32,1"])
+
+        with pytest.raises(jsonschema.ValidationError):
+            parser.func(parser)
+        # The input file is left as is
+        assert read_cache(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST) == cache
+        assert list(tmp_path.iterdir()) == [TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST]
+
     def test_getline_invalid_file(self, tmp_path):
         INPUT_FILE = tmp_path / "nonexistent.json"
 
@@ -228,6 +276,60 @@ class TestCli:
 
         assert merge_result == dest_output
 
+    def test_merge_correct_two_files__streaming(self, tmp_path, streaming):
+        TEST_SMALL_CACHEFILE_THREE_ENTRIES_SRC = TEST_CACHE_PATH / "small_cache_three_entries.json"
+        TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST = tmp_path / "small_cache_three_entries.json"
+
+        TEST_MERGE_OUTPUT = tmp_path / "merge_out.json"
+
+        copyfile(TEST_SMALL_CACHEFILE_THREE_ENTRIES_SRC, TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+        convert_cache_file(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+
+        parser = parse_args(
+            [
+                "merge",
+                str(TEST_CACHE_PATH / "small_cache.json"),
+                str(TEST_CACHE_PATH / "small_cache_one_entry.json"),
+                "--out",
+                str(TEST_MERGE_OUTPUT),
+            ]
+        )
+
+        parser.func(parser)
+
+        assert read_cache(TEST_MERGE_OUTPUT) == read_cache(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+
+    def test_merge_correct_two_files__streaming_infinity(self, tmp_path, streaming):
+        TEST_SMALL_CACHEFILE_ONE_ENTRY_DST = tmp_path / "small_cache_one_entry.json"
+        TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST = tmp_path / "small_cache_three_entries.json"
+
+        TEST_MERGE_OUTPUT = tmp_path / "merge_out.json"
+
+        # Infinity is valid in a cache file, but cannot be streamed
+        for name, dst in [
+            ("small_cache_one_entry.json", TEST_SMALL_CACHEFILE_ONE_ENTRY_DST),
+            ("small_cache_three_entries.json", TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST),
+        ]:
+            copyfile(TEST_CACHE_PATH / name, dst)
+            convert_cache_file(dst)
+            cache = read_cache(dst)
+            cache["cache"]["32,1"]["GFLOP/s"] = float("inf")
+            write_cache(cache, dst)
+
+        parser = parse_args(
+            [
+                "merge",
+                str(TEST_CACHE_PATH / "small_cache.json"),
+                str(TEST_SMALL_CACHEFILE_ONE_ENTRY_DST),
+                "--out",
+                str(TEST_MERGE_OUTPUT),
+            ]
+        )
+
+        parser.func(parser)
+
+        assert read_cache(TEST_MERGE_OUTPUT) == read_cache(TEST_SMALL_CACHEFILE_THREE_ENTRIES_DST)
+
     def test_merge_when_keys_overlap(self, tmp_path):
         TEST_SMALL_CACHEFILE_ONE_ENTRY_SRC = TEST_CACHE_PATH / "small_cache_one_entry.json"
         TEST_SMALL_CACHEFILE_ONE_ENTRY_DST = tmp_path / "small_cache_one_entry.json"
@@ -252,3 +354,44 @@ class TestCli:
 
         with pytest.raises(KeyError):
             parser.func(parser)
+
+    @pytest.fixture
+    def large_cache_latest(self, tmp_path):
+        # Cache lines are only read without loading the whole file from cache files of the latest version
+        TEST_LARGE_CACHEFILE_DST = tmp_path / "large_cache.json"
+        copyfile(TEST_CACHE_PATH / "large_cache.json", TEST_LARGE_CACHEFILE_DST)
+        convert_cache_file(TEST_LARGE_CACHEFILE_DST)
+        return TEST_LARGE_CACHEFILE_DST
+
+    def test_getline_valid_key__streaming(self, large_cache_latest, streaming, capsys, monkeypatch):
+        monkeypatch.setattr(cli_tools, "read_cache_line", lambda filename, key: None)
+        parser = parse_args(["get-line", str(large_cache_latest), "--key", "16,1,1,2,0,0,1,1,15,15"])
+
+        parser.func(parser)
+
+        assert "'block_size_x': 16" in capsys.readouterr().out
+
+    def test_getline_valid_key__from_span(self, large_cache_latest, monkeypatch, capsys):
+        monkeypatch.setattr(cli_tools, "STREAMING_THRESHOLD", 0)
+        monkeypatch.setattr(cli_tools.Cache, "read", None)
+        parser = parse_args(["get-line", str(large_cache_latest), "--key", "16,1,1,2,0,0,1,1,15,15"])
+
+        parser.func(parser)
+
+        assert "'block_size_x': 16" in capsys.readouterr().out
+
+    def test_getline_invalid_version__from_span(self, large_cache_latest, monkeypatch):
+        monkeypatch.setattr(cli_tools, "STREAMING_THRESHOLD", 0)
+        cache = read_cache(large_cache_latest)
+        cache["schema_version"] = "9.9.9"
+        write_cache(cache, large_cache_latest)
+        parser = parse_args(["get-line", str(large_cache_latest), "--key", "16,1,1,2,0,0,1,1,15,15"])
+
+        with pytest.raises(jsonschema.ValidationError):
+            parser.func(parser)
+
+    def test_getline_invalid_key__streaming(self, large_cache_latest, streaming):
+        parser = parse_args(["get-line", str(large_cache_latest), "--key", "1"])
+
+        with pytest.raises(KeyError):
+            parser.func(parser)
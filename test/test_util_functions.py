@@ -606,6 +606,7 @@ def test_process_cache():
             x = 4
         )
         assert len(tuning_options.cache) == 1
+        tuning_options.cache.flush()
 
         # now test process cache with a pre-existing cache file
         process_cache(cache, kernel_options, tuning_options, runner)